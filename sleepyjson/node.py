@@ -1,38 +1,85 @@
 from __future__ import annotations
 
 import re
-from collections import deque
+from array import array
 from enum import Enum, auto
+from functools import lru_cache
+from itertools import zip_longest
+from json.decoder import JSONDecoder, scanstring
+
+from .source import Source
 
 NUMBER_REGEX = re.compile(
     r'''
-        ^                       # The beginning of the string
         -?                      # Optional negative sign
         (?: 0 | [1-9]\d* )      # The integral part, which cannot be empty and
                                 # cannot start with 0, unless it is exactly 0
-        (?: \.\d+ )?            # The optional fractional part
-        (?: [eE] [+-]? \d+ )?   # The optional exponent
+        (?P<fraction>           # The optional fractional part
+            \.\d+
+        )?
+        (?P<exponent>           # The optional exponent
+            [eE] [+-]? \d+
+        )?
 
         # We don't test the end of the string because we don't need to know what
         # comes after the valid number
     ''',
-    re.VERBOSE
+    # Without re.ASCII, \d would also match digits of other scripts
+    re.VERBOSE | re.ASCII
+)
+
+# Matches a run of characters that can be part of a number
+NUMBER_CHARACTERS_REGEX = re.compile(r'[-+0-9eE.]*')
+
+# Matches a number in an array, along with the whitespace and comma after it
+NUMBER_ITEM_REGEX = re.compile(
+    r'''
+        (?P<number>
+            -? (?: 0 | [1-9]\d* )
+            (?P<fraction> \.\d+ )?
+            (?P<exponent> [eE] [+-]? \d+ )?
+        )
+        [\r\n\t ]*
+        (?P<comma> , [\r\n\t ]* )?
+    ''',
+    re.VERBOSE | re.ASCII
 )
 
+# Matches a run of whitespace and comments. The group captures the last comment
+# in the run, which lets us know if the run ends inside a comment. Whitespace is
+# consumed a whole run at a time, rather than one repetition per character,
+# which matters for the long indentation of pretty-printed files
+SKIPPABLE_REGEX = re.compile(r'(?:[\r\n\t ]+|(//[^\n]*))*')
+
+# Matches a run of characters that do not change the nesting of containers,
+# nor start a string or a comment, where brackets would not count
+STRUCTURAL_REGEX = re.compile(r'[^"{}\[\]/]*')
 
-ESCAPE_CHARACTERS_MAP = {
-    '"': '"',
-    '\\': '\\',
-    '/': '/',
-    'b': '\b',
-    'f': '\f',
-    'n': '\n',
-    'r': '\r',
-    't': '\t',
+# Matches the characters that must be escaped in string literals
+ESCAPED_CHARACTERS_REGEX = re.compile(r'["\\\x00-\x1f]')
+
+# Maps the opening brackets of containers to their closing brackets
+CLOSING_BRACKETS = {
+    '{': '}',
+    '[': ']',
 }
 
+# The characters that can be part of a number. A set is faster to check
+# membership against than a string
+NUMBER_CHARACTERS = frozenset('-+0123456789eE.')
+
+# The number of object keys whose unescaped value is cached, and the maximum
+# length of the keys that are cached
+KEY_CACHE_SIZE = 2048
+MAX_CACHED_KEY_LENGTH = 64
+
+
+def reject_constant(name):
+    raise ValueError(f'Unexpected input: {name!r}')
 
-STRING_BUF_LENGTH = 1024
+
+# The `json` module accepts `NaN` and `Infinity`, which are not valid JSON
+BULK_DECODER = JSONDecoder(parse_constant=reject_constant)
 
 
 class NodeType(Enum):
@@ -45,18 +92,18 @@ class NodeType(Enum):
     NULL = auto()
 
 
-SIMPLE_DETERMINANTS = [
-    ('{', NodeType.OBJECT),
-    ('[', NodeType.ARRAY),
-    ('"', NodeType.STRING),
-    ('true', NodeType.TRUE),
-    ('false', NodeType.FALSE),
-    ('null', NodeType.NULL),
-]
-
-NUMBER_DETERMINANTS = '0123456789-'
+# Maps the first character of a value to the text the value must start with
+# and its type. Numbers are determined by their first character alone
+DETERMINANTS = {
+    '{': ('{', NodeType.OBJECT),
+    '[': ('[', NodeType.ARRAY),
+    '"': ('"', NodeType.STRING),
+    't': ('true', NodeType.TRUE),
+    'f': ('false', NodeType.FALSE),
+    'n': ('null', NodeType.NULL),
+}
 
-WHITESPACE = '\r\n\t '
+DETERMINANTS.update((c, (c, NodeType.NUMBER)) for c in '0123456789-')
 
 # The maximum number of characters we need to read in order to determine this
 # node's type
@@ -64,109 +111,144 @@ MAX_NEEDED_CHARS = 5
 
 
 class Node:
-    def __init__(self, file, pos):
-        self.file = file
+    # Files can have millions of nodes, so they do not get an instance dict.
+    # Some of these attributes are only set for the types that use them
+    __slots__ = (
+        'source',
+        'pos',
+        'end',
+        'type',
+        'child_positions',
+        'last_child',
+        'last_key',
+        'scanned',
+        'length',
+        'scalar_value',
+    )
 
-        if not file.seekable():
-            raise ValueError('Nodes need to be able to seek into the file')
+    def __init__(self, file, pos):
+        if isinstance(file, Source):
+            self.source = file
+        else:
+            self.source = Source(file)
 
-        self.skip_to_start(pos)
+        self.pos = self.skip_skippable(pos)
 
         self.end = None
 
         self.type = self.get_type()
 
-        if self.type in [NodeType.ARRAY, NodeType.OBJECT]:
-            self.current_child = None
-
-    def skip_to_start(self, pos):
-        self.file.seek(pos)
-
-        self.skip_skippable()
-
-        self.pos = self.file.tell()
-
-    def skip_skippable(self):
+        if self.type == NodeType.ARRAY or self.type == NodeType.OBJECT:
+            # The positions of the children found so far (for objects, the
+            # positions of their keys), so that revisiting them does not require
+            # reading the file from the start of the container again
+            self.child_positions = array('q')
+
+            self.last_child = None
+
+            # Whether all the children have been found. The end of the
+            # container can be known before that, because skipping over a
+            # container only needs to match its brackets
+            self.scanned = False
+
+            # The number of children, once it has been counted
+            self.length = None
+        elif self.type == NodeType.STRING or self.type == NodeType.NUMBER:
+            # The value of strings and numbers, once it has been read. The
+            # values of arrays and objects are not kept, because they can be
+            # large, and because they are mutable
+            self.scalar_value = None
+
+    def skip_skippable(self, pos):
+        """
+        Returns the position of the first character at or after `pos` that is
+        not whitespace nor part of a comment.
+        """
+
+        # Whether the previous window ended in the middle of a comment
         in_comment = False
 
         while True:
-            c = self.file.read(1)
+            data, offset = self.source.window(pos)
 
-            if c == '':
-                return
+            if offset >= len(data):
+                return pos
 
             if in_comment:
-                if c == '\n':
-                    in_comment = False
-                continue
+                newline = data.find('\n', offset)
 
-            if c in WHITESPACE:
-                continue
+                if newline == -1:
+                    pos += len(data) - offset
 
-            if c == '/':
-                pos = self.file.tell()
-                next_c = self.file.read(1)
+                    continue
 
-                if next_c != '/':
-                    self.file.seek(pos)
-                else:
-                    in_comment = True
+                offset = newline
+                in_comment = False
 
-                continue
+            m = SKIPPABLE_REGEX.match(data, offset)
+            end = m.end()
 
-            break
+            pos = self.source.start + end
 
-        self.file.seek(self.file.tell() - 1)
+            if end < len(data) - 1 or self.source.at_end:
+                return pos
 
-    def skip_comma(self):
-        self.skip_skippable()
+            if end == len(data) - 1:
+                # A slash at the end of the window can be the start of a comment
+                # that continues in the next one
+                if self.peek(pos, 2) != '//':
+                    return pos
+            else:
+                in_comment = m.end(1) == end
 
-        if self.peek(1) == ',':
-            self.file.read(1)
+    def skip_comma(self, pos):
+        """
+        Skips the skippable characters and an optional comma after them,
+        returning the new position and whether the comma was found.
+        """
 
-            self.skip_skippable()
+        pos = self.skip_skippable(pos)
 
-            return True
+        if self.peek(pos, 1) == ',':
+            return self.skip_skippable(pos + 1), True
         else:
-            return False
-
-    def skip_colon(self):
-        self.skip_skippable()
+            return pos, False
 
-        if self.peek(1) == ':':
-            self.file.read(1)
+    def skip_colon(self, pos):
+        """
+        Skips the skippable characters and an optional colon after them,
+        returning the new position and whether the colon was found.
+        """
 
-            self.skip_skippable()
+        pos = self.skip_skippable(pos)
 
-            return True
+        if self.peek(pos, 1) == ':':
+            return self.skip_skippable(pos + 1), True
         else:
-            return False
-
-    def peek(self, n):
-        pos = self.file.tell()
-
-        result = self.file.read(n)
-
-        self.file.seek(pos)
+            return pos, False
 
-        return result
+    def peek(self, pos, n):
+        return self.source.read(pos, n)
 
     def get_type(self):
-        self.file.seek(self.pos)
+        data, offset = self.source.window(self.pos)
 
-        buf = self.peek(MAX_NEEDED_CHARS)
-
-        if not buf:
+        if offset >= len(data):
             raise ValueError('Unexpected end of file')
 
-        for prefix, node_type in SIMPLE_DETERMINANTS:
-            if buf.startswith(prefix):
+        determinant = DETERMINANTS.get(data[offset])
+
+        if determinant is not None:
+            prefix, node_type = determinant
+
+            if data.startswith(prefix, offset):
                 return node_type
 
-        if any(buf[0] == c for c in NUMBER_DETERMINANTS):
-            return NodeType.NUMBER
+            # The value may continue into the next window
+            if self.peek(self.pos, MAX_NEEDED_CHARS).startswith(prefix):
+                return node_type
 
-        raise ValueError(f'Unexpected input: {buf[:10]!r}')
+        raise ValueError(f'Unexpected input: {self.peek(self.pos, 10)!r}')
 
     def is_object(self):
         return self.type == NodeType.OBJECT
@@ -193,50 +275,152 @@ class Node:
         return self.type == NodeType.NULL
 
     def value(self):
-        if self.type == NodeType.TRUE:
+        # The most common types are tested first
+        if self.type == NodeType.STRING:
+            if self.scalar_value is None:
+                length = self.end_position() - self.pos
+
+                literal = self.source.decode(self.peek(self.pos, length))
+
+                self.scalar_value = unescape_string_literal(literal)
+
+            return self.scalar_value
+        elif self.type == NodeType.NUMBER:
+            if self.scalar_value is None:
+                self.scalar_value, length = parse_number(self.source, self.pos)
+
+                self.end = self.pos + length
+
+            return self.scalar_value
+        elif self.type == NodeType.OBJECT:
+            values = self.read_bulk()
+
+            if values is not None:
+                return values
+
+            return {
+                key: child.value() for key, child in self.children_after(None)
+            }
+        elif self.type == NodeType.ARRAY:
+            values = self.read_bulk()
+
+            if values is not None:
+                return values
+
+            values, last = self.read_leading_numbers()
+
+            values.extend(child.value() for child in self.children_after(last))
+
+            return values
+        elif self.type == NodeType.TRUE:
             return True
         elif self.type == NodeType.FALSE:
             return False
         elif self.type == NodeType.NULL:
             return None
-        elif self.type == NodeType.STRING:
-            length = self.end_position() - self.pos
 
-            self.file.seek(self.pos)
+    def read_bulk(self):
+        """
+        Reads the value of a container that fits in the window of the source
+        with the `json` module, which is much faster than reading it node by
+        node. Returns `None` if the container is not strict JSON (because it
+        has comments or trailing commas, or is invalid) or does not fit in the
+        window, in which case it must be read node by node.
+        """
 
-            literal = self.file.read(length)
+        data, offset = self.source.window(self.pos)
 
-            return unescape_string_literal(literal)
-        elif self.type == NodeType.NUMBER:
-            length = self.end_position() - self.pos
+        # Make sure the window does not end too close to the container
+        if not self.source.at_end and offset > len(data) // 2:
+            self.source.fill(self.pos)
 
-            self.file.seek(self.pos)
+            data, offset = self.source.window(self.pos)
 
-            literal = self.file.read(length)
+        try:
+            value, end = BULK_DECODER.raw_decode(data, offset)
+        except ValueError:
+            return None
 
-            try:
-                return int(literal)
-            except ValueError:
-                return float(literal)
-        elif self.type == NodeType.ARRAY:
-            return [child.value() for child in iter(self)]
-        elif self.type == NodeType.OBJECT:
-            return {key: child.value() for key, child in self.items()}
+        self.end = self.source.start + end
+
+        if self.source.encoding is not None:
+            literal = data[offset:end]
+
+            if not literal.isascii():
+                value = BULK_DECODER.decode(self.source.decode(literal))
+
+        return value
+
+    def read_leading_numbers(self):
+        """
+        Reads the values of the numbers at the start of the array, without
+        building a node for each of them. Arrays of numbers are common and this
+        is much faster than the general path, which can then continue after the
+        node of the last number, returned with the values (or `None`).
+        """
+
+        values = []
+
+        last_pos = None
+
+        pos = self.skip_skippable(self.pos + 1)
+
+        while True:
+            data, offset = self.source.window(pos)
+
+            m = NUMBER_ITEM_REGEX.match(data, offset)
+
+            if m is None:
+                break
+
+            # If the match runs until the end of the window, or if the number
+            # is followed by a number character (as in `1.` or `1e`), the item
+            # may continue into the next window, so we read it again from a
+            # window that starts here
+            complete = self.source.at_end or (
+                m.end() < len(data)
+                and data[m.end('number')] not in NUMBER_CHARACTERS
+            )
+
+            if not complete:
+                if offset == 0:
+                    break
+
+                self.source.fill(pos)
+
+                continue
+
+            if m.group('fraction') is None and m.group('exponent') is None:
+                values.append(int(m.group('number')))
+            else:
+                values.append(float(m.group('number')))
+
+            last_pos = pos
+
+            if m.group('comma') is None:
+                break
+
+            pos = self.source.start + m.end()
+
+        if last_pos is None:
+            return values, None
+
+        return values, Node(self.source, last_pos)
 
     def end_position(self):
         if self.end is None:
-            if self.type == NodeType.TRUE:
+            if self.type == NodeType.STRING:
+                self.end = self.pos + measure_string(self.source, self.pos)
+            elif self.type == NodeType.NUMBER:
+                self.end = self.pos + measure_number(self.source, self.pos)
+            elif self.type == NodeType.OBJECT or self.type == NodeType.ARRAY:
+                self.end = self.match_brackets(self.pos)
+            elif self.type == NodeType.TRUE:
                 self.end = self.pos + 4
             elif self.type == NodeType.FALSE:
                 self.end = self.pos + 5
             elif self.type == NodeType.NULL:
                 self.end = self.pos + 4
-            elif self.type == NodeType.STRING:
-                self.end = self.pos + measure_string(self.file, self.pos)
-            elif self.type == NodeType.NUMBER:
-                self.end = self.pos + measure_number(self.file, self.pos)
-            elif self.type in [NodeType.ARRAY, NodeType.OBJECT]:
-                self.seek_to_end()
 
         return self.end
 
@@ -248,142 +432,297 @@ class Node:
                 )
 
             if key < 0:
-                queue = deque(self, -key)
+                # Find all the items, so that we know where the last ones are
+                self.seek_to_end()
 
-                if len(queue) < -key:
-                    raise IndexError('Array index out of bounds')
-                else:
-                    return queue[0]
-            else:
-                try:
-                    # I'd like `iter(self).nth(i)` but it doesn't exist
-                    return next(child for i, child in enumerate(self) if i == key)
-                except StopIteration:
+                key += len(self.child_positions)
+
+                if key < 0:
                     raise IndexError('Array index out of bounds')
 
+            child = self.array_child(key)
+
+            if child is None:
+                raise IndexError('Array index out of bounds')
+
+            return child
+
         elif self.type == NodeType.OBJECT:
             if not isinstance(key, str):
                 raise ValueError(
                     f'Can only index objects with strings, not {type(key)}'
                 )
 
-            try:
-                return next(child for child_key, child in self.items() if child_key == key)
-            except StopIteration:
+            # Most keys have nothing to escape, so their literals in the file
+            # can be compared with the key directly, without unescaping them
+            literal = self.key_literal(key)
+
+            for pos in self.child_positions:
+                key_end, value_pos = self.seek_object_value(pos)
+
+                if self.key_matches(pos, key_end, key, literal):
+                    return Node(self.source, value_pos)
+
+            child = self.scan_children(key)
+
+            if child is None:
                 raise KeyError('Key not found')
 
+            return child
+
         else:
             raise ValueError(f'Cannot index values of type {self.type}')
 
     def __len__(self):
-        return sum(1 for _ in self)
+        if self.type != NodeType.ARRAY and self.type != NodeType.OBJECT:
+            raise ValueError(
+                f'Cannot get the length of values of type {self.type}'
+            )
+
+        if self.scanned:
+            return len(self.child_positions)
+
+        # Only the number of children is kept, since keeping their positions
+        # would take memory for each of them
+        if self.length is None:
+            self.length = self.count_children()
+
+        return self.length
 
     def __iter__(self):
         if self.type == NodeType.OBJECT:
-            yield from (key for key, _ in self.items())
+            yield from (key for key, _ in self.iter_children())
         elif self.type == NodeType.ARRAY:
-            yield from self.array_iter()
+            yield from self.iter_children()
         else:
             raise ValueError(
                 f'Cannot iterate over a value of type {self.type}'
             )
 
-    def array_iter(self):
-        self.current_child = None
-
-        self.file.seek(self.pos)
-
-        while True:
-            self.current_child = self.read_next_array_child()
-
-            if self.current_child is not None:
-                yield self.current_child
-            else:
-                return
-
     def items(self):
         if self.type != NodeType.OBJECT:
             raise ValueError(
                 f'Cannot get keys of values of type {self.type}'
             )
 
-        self.current_child = None
+        yield from self.iter_children()
+
+    def iter_children(self):
+        """
+        Yields the children of this container: nodes for arrays, and `(key,
+        node)` pairs for objects. Children that have been found before are read
+        from their known positions, and the others are read from the file
+        without keeping their positions, so that going through a long container
+        does not take memory for each of its children.
+        """
+
+        if self.type == NodeType.ARRAY:
+            read_child = self.array_child
+        else:
+            read_child = self.object_child
+
+        last = None
+        index = 0
 
-        self.file.seek(self.pos)
+        while index < len(self.child_positions):
+            child = read_child(index)
+
+            yield child
+
+            last = child if self.type == NodeType.ARRAY else child[1]
+            index += 1
+
+        if not self.scanned:
+            yield from self.children_after(last)
+
+    def children_after(self, child):
+        """
+        Yields the children that follow the given child node, or all of them if
+        it is `None`, like `iter_children`, but without keeping their positions.
+        """
 
         while True:
-            self.current_child = self.read_next_object_child()
+            pos, must_end = self.seek_child_after(child)
 
-            if self.current_child is not None:
-                yield (self.last_key, self.current_child)
-            else:
+            if self.closes_at(pos, must_end):
                 return
 
-    def read_next_array_child(self):
-        must_end = self.seek_next_child()
+            if self.type == NodeType.ARRAY:
+                child = Node(self.source, pos)
 
-        if must_end and self.peek(1) != ']':
-            if self.peek(1) == '':
-                raise ValueError(f'Unexpected end of file')
+                yield child
             else:
-                raise ValueError(
-                    f'Unexpected input {self.peek(10)!r} inside array')
+                key, child = self.read_object_entry(pos)
+
+                yield (key, child)
+
+    def array_child(self, index):
+        """
+        Returns the node of the array item at the given index, or `None` if the
+        array has fewer items. Items that have been found before are read
+        directly from their known position.
+        """
+
+        if not self.find_children(index):
+            return None
+
+        if index == len(self.child_positions) - 1:
+            return self.last_child
 
-        if self.peek(1) == ']':
-            self.file.read(1)
+        return Node(self.source, self.child_positions[index])
 
-            self.end = self.file.tell()
+    def object_child(self, index):
+        """
+        Returns the `(key, node)` pair of the object entry at the given index,
+        or `None` if the object has fewer entries. Entries that have been found
+        before are read directly from the known position of their key.
+        """
 
+        if not self.find_children(index):
             return None
 
-        return Node(self.file, self.file.tell())
+        if index == len(self.child_positions) - 1:
+            return (self.last_key, self.last_child)
+
+        return self.read_object_entry(self.child_positions[index])
+
+    def find_children(self, index):
+        """
+        Reads children from the file until the child at the given index has
+        been found. Returns whether the container has that many children.
+        """
+
+        while len(self.child_positions) <= index:
+            if self.scanned:
+                return False
+
+            if self.type == NodeType.ARRAY:
+                self.read_next_array_child()
+            else:
+                self.read_next_object_child()
+
+        return True
+
+    def read_next_array_child(self):
+        pos, must_end = self.seek_next_child()
+
+        if self.closes_at(pos, must_end):
+            self.scanned = True
+
+            return
+
+        self.last_child = Node(self.source, pos)
+
+        self.child_positions.append(pos)
 
     def read_next_object_child(self):
-        must_end = self.seek_next_child()
+        pos, must_end = self.seek_next_child()
+
+        if self.closes_at(pos, must_end):
+            self.scanned = True
+
+            return
+
+        self.last_key, self.last_child = self.read_object_entry(pos)
+
+        self.child_positions.append(pos)
+
+    def closes_at(self, pos, must_end):
+        """
+        Returns whether the container closes at the given position, where its
+        next child would otherwise start, setting its end if so. If no
+        comma separates that position from the previous child, the container
+        must close there.
+        """
+
+        char = self.peek(pos, 1)
 
-        if must_end and self.peek(1) != '}':
-            if self.peek(1) == '':
+        if char == (']' if self.type == NodeType.ARRAY else '}'):
+            self.end = pos + 1
+
+            return True
+
+        if must_end:
+            if char == '':
                 raise ValueError(f'Unexpected end of file')
             else:
+                name = 'array' if self.type == NodeType.ARRAY else 'object'
+
                 raise ValueError(
-                    f'Unexpected input {self.peek(10)!r} inside object')
+                    f'Unexpected input {self.peek(pos, 10)!r} inside {name}')
 
-        if self.peek(1) == '}':
-            self.file.read(1)
+        return False
 
-            self.end = self.file.tell()
+    def read_object_entry(self, pos):
+        key_end, value_pos = self.seek_object_value(pos)
 
-            return None
+        key = unescape_key(self.source.decode(self.peek(pos, key_end - pos)))
 
-        # We need to read a string. This string will not be a real node, but we
-        # treat it as such here because it greatly simplifies the code, even
-        # though it will probably use more memory than strictly needed. But its
-        # use is temporary anyway, so this shouldn't be much of a problem.
-        this_key = Node(self.file, self.file.tell())
+        return (key, Node(self.source, value_pos))
 
-        if this_key.type != NodeType.STRING:
-            raise ValueError(f'Cannot use {this_key.type} as object key')
+    def seek_object_value(self, pos):
+        """
+        Skips the key at the given position and the colon after it, returning
+        the end of the key and the position of the value.
+        """
 
-        self.last_key = this_key.value()
+        # Keys are read directly, without building a node for them, since we
+        # only need their value
+        if self.peek(pos, 1) != '"':
+            # Build a node anyway, only to report what was found instead
+            raise ValueError(
+                f'Cannot use {Node(self.source, pos).type} as object key'
+            )
 
-        self.file.seek(this_key.end_position())
+        key_end = pos + measure_string(self.source, pos)
 
-        if not self.skip_colon():
+        pos, found = self.skip_colon(key_end)
+
+        if not found:
             raise ValueError('Expecting a colon')
 
-        return Node(self.file, self.file.tell())
+        return key_end, pos
 
-    def seek_next_child(self):
-        if self.current_child is None:
-            self.file.seek(self.pos + 1)
+    def value_end(self, pos):
+        """
+        Returns the end of the value at the given position. Strings, numbers
+        and containers are measured without building a node for them.
+        """
 
-            self.skip_skippable()
+        determinant = DETERMINANTS.get(self.peek(pos, 1))
+        node_type = None if determinant is None else determinant[1]
 
-            return False
+        if node_type == NodeType.STRING:
+            return pos + measure_string(self.source, pos)
+        elif node_type == NodeType.NUMBER:
+            return pos + measure_number(self.source, pos)
+        elif node_type == NodeType.OBJECT or node_type == NodeType.ARRAY:
+            return self.match_brackets(pos)
+        else:
+            # Literals are short, and the node checks that they are valid
+            return Node(self.source, pos).end_position()
+
+    def seek_next_child(self):
+        """
+        Finds where the next child starts, returning that position and whether
+        the container must end there (because no comma separates it from the
+        previous child).
+        """
+
+        return self.seek_child_after(self.last_child)
+
+    def seek_child_after(self, child):
+        """
+        Like `seek_next_child`, but for the child that follows the given child
+        node, or for the first child if it is `None`.
+        """
+
+        if child is None:
+            return self.skip_skippable(self.pos + 1), False
         else:
-            self.file.seek(self.current_child.end_position())
+            pos, found = self.skip_comma(child.end_position())
 
-            return not self.skip_comma()
+            return pos, not found
 
     def __contains__(self, item):
         if self.type == NodeType.ARRAY:
@@ -396,139 +735,364 @@ class Node:
             )
 
     def equals(self, other):
+        """
+        Returns whether the value of this node is equal to `other`, reading
+        only as much of the node as needed to find a difference.
+        """
+
         if self.type == NodeType.ARRAY:
-            return all(left.equals(right) for left, right in zip(self, other))
-        elif self.type == NodeType.OBJECT:
+            if not isinstance(other, list):
+                return False
+
+            # Arrays of different lengths are different, which is found when
+            # one of them runs out of items
             sentinel = object()
 
-            return all(lvalue.equals(other.get(lkey, sentinel)) for lkey, lvalue in self.items())
+            return all(
+                left is not sentinel and left.equals(right)
+                for left, right in zip_longest(self, other, fillvalue=sentinel)
+            )
+        elif self.type == NodeType.OBJECT:
+            if not isinstance(other, dict):
+                return False
+
+            keys = set()
+
+            for key, child in self.items():
+                if key not in other or not child.equals(other[key]):
+                    return False
+
+                keys.add(key)
+
+            return len(keys) == len(other)
         else:
             return self.value() == other
 
     def seek_to_end(self):
-        # Force a complete iteration on the value
-        for _ in self:
-            pass
+        # Find all the children, which also finds where the value ends
+        self.scan_children()
+
+    def scan_children(self, key=None):
+        """
+        Finds the children that have not been found yet, until the end of the
+        container or, for objects, until the entry with the given key. Only
+        their positions are kept, so no nodes are built for them, except for
+        the last one. Returns the node of the value of that key, if found.
+        """
+
+        if self.scanned:
+            return None
 
+        pos, must_end = self.seek_next_child()
 
-def measure_string(file, pos):
-    file.seek(pos + 1)  # Skip the start quote
+        last_pos = None
 
-    result = 1
-    prev_was_backslash = False
+        if key is not None:
+            literal = self.key_literal(key)
 
-    while True:
-        buf = file.read(STRING_BUF_LENGTH)
+        try:
+            while not self.closes_at(pos, must_end):
+                child_pos = pos
 
-        if len(buf) == 0:
-            raise ValueError('The string does not terminate')
+                if self.type == NodeType.OBJECT:
+                    key_end, pos = self.seek_object_value(child_pos)
+
+                    if key is not None and self.key_matches(
+                        child_pos, key_end, key, literal
+                    ):
+                        self.child_positions.append(child_pos)
+
+                        last_pos = child_pos
+
+                        break
+
+                pos, found = self.skip_comma(self.value_end(pos))
+
+                must_end = not found
+
+                # Children are only kept once they have been read in full, so
+                # that a child that cannot be read is tried again next time
+                self.child_positions.append(child_pos)
+
+                last_pos = child_pos
+            else:
+                self.scanned = True
+        finally:
+            # The last child must match the last position, even if a later
+            # child could not be read
+            if last_pos is not None:
+                self.keep_last_child(last_pos)
+
+        return None if self.scanned else self.last_child
+
+    def count_children(self):
+        """
+        Counts the children of the container, reading the file from the last
+        child that has been found, but without keeping the positions of the
+        others, nor building nodes for them.
+        """
+
+        n_children = len(self.child_positions)
+
+        pos, must_end = self.seek_next_child()
+
+        while not self.closes_at(pos, must_end):
+            if self.type == NodeType.OBJECT:
+                _, pos = self.seek_object_value(pos)
+
+            pos, found = self.skip_comma(self.value_end(pos))
+
+            must_end = not found
+
+            n_children += 1
+
+        return n_children
+
+    def keep_last_child(self, pos):
+        """
+        Builds the node of the child at the given position, which must be the
+        last one whose position is kept.
+        """
+
+        if self.type == NodeType.ARRAY:
+            self.last_child = Node(self.source, pos)
+        else:
+            self.last_key, self.last_child = self.read_object_entry(pos)
+
+    def key_literal(self, key):
+        """
+        Returns the literal of the key as it appears in the window when it is
+        written without escapes, or `None` if the key has characters that
+        must be escaped (or cannot be encoded), in which case the key literals
+        in the file can only be compared once unescaped.
+        """
+
+        if ESCAPED_CHARACTERS_REGEX.search(key) is not None:
+            return None
+
+        try:
+            return self.source.encode(f'"{key}"')
+        except UnicodeEncodeError:
+            return None
+
+    def key_matches(self, pos, key_end, key, literal):
+        """
+        Returns whether the key literal between `pos` and `key_end` has the
+        given value. `literal` is the result of `key_literal` for that value.
+        """
+
+        text = self.peek(pos, key_end - pos)
+
+        if literal is None:
+            return unescape_key(self.source.decode(text)) == key
+
+        if text == literal:
+            return True
+
+        # The literal can still have the same value if it escapes characters
+        # that did not need to be escaped
+        return '\\' in text and unescape_key(self.source.decode(text)) == key
+
+    def match_brackets(self, pos):
+        """
+        Returns the end position of the container at the given position (this
+        node, or one of its children) by matching its brackets, without
+        building nodes for its contents. Strings and comments are skipped,
+        since they can contain brackets, but the values inside the container
+        are not otherwise validated until they are read.
+        """
+
+        # The closing brackets that are still expected, innermost last
+        closers = []
+
+        # This loop runs once per bracket, string and comment of the container,
+        # so the lookups it repeats are bound to local names
+        source = self.source
+        window = source.window
+        match_structural = STRUCTURAL_REGEX.match
 
-        quote_pos = 0
         while True:
-            quote_pos = buf.find('"', quote_pos)
+            data, offset = window(pos)
 
-            if quote_pos == -1:
-                break
-            elif (quote_pos == 0 and prev_was_backslash) or (quote_pos > 0 and buf[quote_pos - 1] == '\\'):
-                # Skip this quote
-                quote_pos += 1
+            if offset >= len(data):
+                raise ValueError('Unexpected end of file')
+
+            offset = match_structural(data, offset).end()
 
+            pos = source.start + offset
+
+            if offset == len(data):
                 continue
+
+            char = data[offset]
+
+            if char == '"':
+                pos += measure_string(source, pos)
+            elif char == '/':
+                comment_end = self.skip_skippable(pos)
+
+                if comment_end == pos:
+                    raise ValueError(
+                        f'Unexpected input {self.peek(pos, 10)!r} inside container'
+                    )
+
+                pos = comment_end
+            elif char in CLOSING_BRACKETS:
+                closers.append(CLOSING_BRACKETS[char])
+
+                pos += 1
             else:
+                if closers.pop() != char:
+                    raise ValueError(
+                        f'Unexpected {char!r} inside container'
+                    )
+
+                pos += 1
+
+                if not closers:
+                    return pos
+
+
+def measure_string(source, pos):
+    result = 1  # Skip the start quote
+
+    # Whether the first character of the next chunk is escaped by a backslash
+    # at the end of the previous one
+    escaped = False
+
+    while True:
+        buf, start = source.window(pos + result)
+
+        if start >= len(buf):
+            raise ValueError('The string does not terminate')
+
+        i = start + 1 if escaped else start
+
+        # Jump from backslash to backslash, skipping the character each one
+        # escapes, until there are no more backslashes before the next quote.
+        # This correctly handles escaped backslashes followed by a quote (`\\"`)
+        quote = buf.find('"', i)
+        while True:
+            if quote != -1 and quote < i:
+                quote = buf.find('"', i)
+
+            end = len(buf) if quote == -1 else quote
+
+            backslash = buf.find('\\', i, end)
+
+            if backslash == -1:
                 break
 
-        if quote_pos == -1:
-            # We did not find a quote, so we need to search longer
-            if '\n' in buf:
-                raise ValueError('End of line while scanning string')
+            i = backslash + 2
 
-            result += len(buf)
+        if buf.find('\n', start, end) != -1:
+            raise ValueError('End of line while scanning string')
+
+        if quote == -1:
+            # We did not find a quote, so we need to search longer
+            result += len(buf) - start
 
-            prev_was_backslash = buf[-1] == '\\'
+            escaped = i > len(buf)
 
             continue
 
-        break
+        return result + quote - start + 1
 
-    buf = buf[:quote_pos]
 
-    if '\n' in buf:
-        raise ValueError('End of line while scanning string')
+def unescape_key(literal):
+    """
+    Unescapes the literal of an object key. Objects in the same file tend to
+    repeat their keys, so the keys that are short enough are cached.
+    """
 
-    result += len(buf) + 1
+    if len(literal) <= MAX_CACHED_KEY_LENGTH:
+        return unescape_cached_key(literal)
+    else:
+        return unescape_string_literal(literal)
 
-    return result
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def unescape_cached_key(literal):
+    return unescape_string_literal(literal)
 
 
 def unescape_string_literal(literal):
-    parts = []
+    """
+    Returns the value of a string literal, quotes included. The unescaping is
+    done by the scanner of the standard `json` module, which is implemented in
+    C and also joins surrogate pairs (such as `\\ud83d\\ude00`) into a single
+    character. Control characters are allowed inside the string.
+    """
 
-    prev = 1
-    while True:
-        backslash = literal.find('\\', prev)
+    # Most strings have nothing to unescape
+    if '\\' not in literal:
+        return literal[1:-1]
 
-        if backslash == -1:
-            parts.append(literal[prev:-1])
-            break
+    value, _ = scanstring(literal, 1, False)
 
-        parts.append(literal[prev:backslash])
+    return value
 
-        next_char = literal[backslash + 1]
 
-        escaped = ESCAPE_CHARACTERS_MAP.get(next_char, None)
+def measure_number(source, pos):
+    m = match_number(source, pos)
 
-        if escaped is not None:
-            parts.append(escaped)
+    return m.end() - m.start()
 
-            prev = backslash + 2
-        elif next_char == 'u':
-            codepoint = literal[backslash + 2:backslash + 6]
 
-            if len(codepoint) != 4:
-                raise ValueError(f'Truncated unicode escaped value: \\u{codepoint}')
+def parse_number(source, pos):
+    """
+    Returns the value of the number at the given position and its length.
+    """
 
-            for i, c in enumerate(codepoint):
-                if c not in '0123456789abcdefABCDEF':
-                    hexadigis = codepoint[:i]
+    m = match_number(source, pos)
 
-                    raise ValueError(f'Truncated unicode escaped value: \\u{hexadigis}')
+    text = m.group()
 
-            codepoint = int(codepoint, 16)
+    # The only groups are the fraction and the exponent, so if no group took
+    # part in the match, the number is an integer
+    if m.lastindex is None:
+        value = int(text)
+    else:
+        value = float(text)
 
-            parts.append(chr(codepoint))
+    return value, len(text)
 
-            prev = backslash + 6
-        else:
-            raise ValueError(f'Unknown escaped sequence: \\{next_char}')
 
-    return ''.join(parts)
+def match_number(source, pos):
+    """
+    Matches the number at the given position, directly in the window of the
+    source. The match object is relative to the start of that window.
+    """
 
+    while True:
+        data, offset = source.window(pos)
 
-def measure_number(file, pos):
-    file.seek(pos)
+        m = NUMBER_REGEX.match(data, offset)
 
-    accumulated = []
+        if m is None:
+            # A number cut by the end of the window (such as a lone `-`) does
+            # not match yet, so we try again in a window that starts here
+            if not source.at_end and (
+                NUMBER_CHARACTERS_REGEX.match(data, offset).end() == len(data)
+            ):
+                source.fill(pos, 2 * (len(data) - offset))
 
-    while True:
-        # TODO: I must ensure that the file is actually buffered, or else this
-        # line, reading one character at a time, will take an unnecessary long
-        # time to run
-        c = file.read(1)
-
-        if c == '':
-            break
-        elif c in '-+0123456789eE.':
-            accumulated.append(c)
-        else:
-            break
+                continue
 
-    accumulated = ''.join(accumulated)
+            raise ValueError(
+                f'Number starts with a wrong character {data[offset:offset + 1]}'
+            )
 
-    m = NUMBER_REGEX.match(accumulated)
+        # If the characters after the match that could still be part of a
+        # number run until the end of the window, the number may continue into
+        # the next one, so we match it again in a larger window that starts
+        # here. Usually the number is simply followed by another character
+        end = m.end()
 
-    if m is None:
-        raise ValueError(
-            f'Number starts with a wrong character {accumulated[0]}'
-        )
+        if source.at_end or (end < len(data) and data[end] not in NUMBER_CHARACTERS):
+            return m
+
+        if NUMBER_CHARACTERS_REGEX.match(data, end).end() < len(data):
+            return m
 
-    return m.end()
+        source.fill(pos, 2 * (len(data) - offset))
@@ -1,25 +1,63 @@
 from .node import Node
+from .source import Source
 
 
 class Reader:
     def __init__(self, files):
         ft = file_type(files)
 
-        if ft == '':
+        if ft == '' or ft == b'':
             self.files = iter([files])
-        elif ft == b'':
-            raise ValueError('Needs a text file')
         else:
             self.files = iter(files)
 
         self.current_file = next(self.files)
         self.next_file = False
 
-        self.node = Node(self.current_file, 0)
+        self.node = Node(Source(self.current_file), 0)
 
     def __getattr__(self, name: str):
         return getattr(self.node, name)
 
+    # The most used methods of the node are forwarded directly, which is
+    # cheaper than going through `__getattr__`
+
+    def value(self):
+        return self.node.value()
+
+    def items(self):
+        return self.node.items()
+
+    def end_position(self):
+        return self.node.end_position()
+
+    def equals(self, other):
+        return self.node.equals(other)
+
+    def is_object(self):
+        return self.node.is_object()
+
+    def is_array(self):
+        return self.node.is_array()
+
+    def is_string(self):
+        return self.node.is_string()
+
+    def is_number(self):
+        return self.node.is_number()
+
+    def is_true(self):
+        return self.node.is_true()
+
+    def is_false(self):
+        return self.node.is_false()
+
+    def is_boolean(self):
+        return self.node.is_boolean()
+
+    def is_null(self):
+        return self.node.is_null()
+
     def __getitem__(self, key):
         return self.node[key]
 
@@ -33,14 +71,16 @@ class Reader:
         if self.node_finishes_stream():
             self.current_file = next(self.files)
 
-            if file_type(self.current_file) != '':
-                raise ValueError('Needs a text file')
+            if file_type(self.current_file) not in ('', b''):
+                raise ValueError('Needs a file')
 
+            source = Source(self.current_file)
             pos = 0
         else:
+            source = self.node.source
             pos = self.node.end_position()
 
-        self.node = Node(self.current_file, pos)
+        self.node = Node(source, pos)
 
     def jump(self, n):
         if n < 0:
@@ -50,16 +90,22 @@ class Reader:
             self.next()
 
     def node_finishes_stream(self):
-        self.node.file.seek(self.node.end_position())
+        pos = self.node.skip_skippable(self.node.end_position())
 
-        self.node.skip_skippable()
-
-        return self.node.peek(1) == ''
+        return self.node.peek(pos, 1) == ''
 
 
 def file_type(file):
-    try:
-        return file.read(0)
-    except:
+    """
+    Returns what reading nothing from the file gives: `''` for text files and
+    `b''` for binary files. Returns `False` for values that are not files.
+    Errors from reading an actual file, such as a closed one, are not hidden.
+    """
+
+    read = getattr(file, 'read', None)
+
+    if read is None:
         return False
 
+    return read(0)
+
@@ -0,0 +1,111 @@
+import codecs
+
+BUF_LENGTH = 64 * 1024
+
+
+class Source:
+    """
+    A seekable text or binary file, read through a window of its contents that
+    is kept in memory. All the nodes created from the same file share one
+    source, so that looking at nearby characters does not require going back
+    to the file.
+    """
+
+    def __init__(self, file):
+        if not file.seekable():
+            raise ValueError('Nodes need to be able to seek into the file')
+
+        # The file is kept even when its buffer is read instead, because closing
+        # (or garbage collecting) a text file closes its buffer too
+        self.file = file
+        self.stream = file
+
+        # Text files can only seek to positions returned by `tell()`, which do
+        # not match the number of characters read when the file contains
+        # multi-byte characters. So UTF-8 files are read from their underlying
+        # binary buffer instead, and each byte is decoded as latin-1 into a
+        # single character. Positions are then byte offsets, and the structural
+        # characters of JSON, all ASCII, are found as usual. The text of string
+        # literals is converted back with `decode`. Binary files are read the
+        # same way, as UTF-8 is the encoding of JSON
+        self.encoding = None
+
+        buffer = getattr(file, 'buffer', None)
+        encoding = getattr(file, 'encoding', None)
+
+        if isinstance(file.read(0), bytes):
+            self.encoding = 'utf-8'
+        elif buffer is not None and encoding is not None:
+            if codecs.lookup(encoding).name == 'utf-8':
+                self.stream = buffer
+                self.encoding = 'utf-8'
+
+        # The window is the text of the file starting at position `start`. If
+        # `at_end` is true, the window extends until the end of the file
+        self.start = 0
+        self.data = ''
+        self.at_end = False
+
+    def fill(self, pos, n=0):
+        self.stream.seek(pos)
+
+        length = max(n, BUF_LENGTH)
+
+        data = self.stream.read(length)
+
+        self.start = pos
+        self.data = data if self.encoding is None else data.decode('latin-1')
+        self.at_end = len(data) < length
+
+    def window(self, pos):
+        """
+        Returns the text of the window and the offset of `pos` in that text,
+        reading from the file if `pos` is not inside the current window. An
+        offset equal to the length of the text means that `pos` is at the end
+        of the file.
+        """
+
+        offset = pos - self.start
+
+        if offset < 0 or (offset >= len(self.data) and not self.at_end):
+            self.fill(pos)
+
+            offset = 0
+
+        return self.data, offset
+
+    def read(self, pos, n):
+        """
+        Returns (at most) `n` characters of the file, starting at `pos`.
+        """
+
+        offset = pos - self.start
+
+        if offset < 0 or (offset + n > len(self.data) and not self.at_end):
+            self.fill(pos, n)
+
+            offset = 0
+
+        return self.data[offset:offset + n]
+
+    def decode(self, text):
+        """
+        Returns the actual text of a piece of the window, such as a string
+        literal, for sources that read the bytes of the file.
+        """
+
+        if self.encoding is None or text.isascii():
+            return text
+
+        return text.encode('latin-1').decode(self.encoding)
+
+    def encode(self, text):
+        """
+        Returns the text as it would appear in the window, the reverse of
+        `decode`.
+        """
+
+        if self.encoding is None or text.isascii():
+            return text
+
+        return text.encode(self.encoding).decode('latin-1')
@@ -1,4 +1,6 @@
 import gc
+import hashlib
+import inspect
 import os
 import string
 import random
@@ -9,7 +11,12 @@ from sleepyjson import Reader
 
 
 def save_long_json(f, allow_comments=True, allow_trailing_comma=True):
-    rand = random.Random(1337)
+    # The seed is chosen so that the file has about 30 MB
+    rand = random.Random(8)
+
+    # The characters of strings are drawn from a separate generator, so that
+    # the shape of the file does not depend on how they are drawn
+    text_rand = random.Random(1337)
 
     def make_value(depth):
         if depth < 5:
@@ -34,7 +41,7 @@ def save_long_json(f, allow_comments=True, allow_trailing_comma=True):
 
     def make_number():
         def make_digit_string(n):
-            return ''.join(rand.choice(string.digits) for _ in range(rand.randrange(1, n + 1)))
+            return ''.join(text_rand.choices(string.digits, k=rand.randrange(1, n + 1)))
 
         if rand.randrange(2) < 1:
             sign = '-'
@@ -60,11 +67,9 @@ def save_long_json(f, allow_comments=True, allow_trailing_comma=True):
         f.write(sign + integer + decimal + exponent)
 
     def make_string(t):
-        def make_char():
-            r = rand.randrange(1000)
-
+        def make_char(r):
             if t == 'value' and r < 1:
-                return '\\u00' + ''.join(rand.choice(string.hexdigits) for _ in range(2))
+                return '\\u00' + ''.join(text_rand.choices(string.hexdigits, k=2))
             elif t == 'value' and r < 2:
                 return '\\t'
             elif t == 'value' and r < 3:
@@ -76,11 +81,9 @@ def save_long_json(f, allow_comments=True, allow_trailing_comma=True):
             elif t == 'value' and r < 6:
                 return '\\"'
             elif t in ['value', 'comment'] and r < 10:
-                return rand.choice('.,')
-            elif r < 20:
-                return ' '
+                return text_rand.choice('.,')
             else:
-                return rand.choice(string.ascii_letters)
+                return ' '
 
         if t == 'key':
             length = rand.randrange(2, 15)
@@ -89,7 +92,15 @@ def save_long_json(f, allow_comments=True, allow_trailing_comma=True):
         else:
             length = rand.randrange(10, 1000)
 
-        result = ''.join(make_char() for _ in range(length))
+        # Most characters are letters, so they are all drawn at once, and only
+        # the few that are something else are replaced afterwards
+        chars = text_rand.choices(string.ascii_letters, k=length)
+
+        for i, r in enumerate(text_rand.choices(range(1000), k=length)):
+            if r < 20:
+                chars[i] = make_char(r)
+
+        result = ''.join(chars)
 
         if t == 'comment':
             f.write('// ')
@@ -145,23 +156,52 @@ def save_long_json(f, allow_comments=True, allow_trailing_comma=True):
 
     make_object(0)
 
+PROCESS = psutil.Process()
+
 def get_memory_usage():
+    # Collect garbage first, so that memory that is no longer used does not
+    # count towards the measurement
     gc.collect()
 
-    return psutil.Process().memory_info().rss
+    return PROCESS.memory_info().rss
+
+@pytest.fixture(scope='session')
+def long_sample_path(tmp_path_factory):
+    """
+    Returns the path of a long JSON file, which is only generated if it does
+    not exist yet. The file is kept between test sessions, under a name that
+    changes when the generator or its options change.
+    """
+
+    options = {'allow_comments': False, 'allow_trailing_comma': False}
+
+    key = hashlib.sha1(
+        (inspect.getsource(save_long_json) + repr(options)).encode()
+    ).hexdigest()[:12]
+
+    path = tmp_path_factory.getbasetemp().parent / f'sleepyjson-{key}.json'
+
+    if not path.exists():
+        # Write to a temporary file first, so that an interrupted session does
+        # not leave an incomplete file behind
+        partial = path.with_suffix('.partial')
+
+        with open(partial, 'w') as f:
+            save_long_json(f, **options)
+
+        os.replace(partial, path)
+
+    return path
 
 @pytest.mark.slow
-def test_long_sample():
-    if not os.path.exists('tmp.json'):
-        with open('tmp.json', 'w') as f:
-            save_long_json(f, False, False)
+def test_long_sample(long_sample_path):
 
     # This test is a bit brittle. The idea is to test that the memory usage when
     # reading the whole object into an actual python dictionary is much higher
     # than the memory usage when just iterating over the file. I'm not even sure
     # what I'm doing here...
 
-    with open('tmp.json') as f:
+    with open(long_sample_path) as f:
         start_memory = get_memory_usage()
         reader = Reader(f)
         value = reader.value()
@@ -169,7 +209,7 @@ def test_long_sample():
 
     del value
 
-    with open('tmp.json') as f:
+    with open(long_sample_path) as f:
         start_memory = get_memory_usage()
         reader = Reader(f)
         length = len(reader)
@@ -179,6 +219,37 @@ def test_long_sample():
 
     assert memory_usage_on_iteration_only < memory_usage_with_full_value / 1000
 
+@pytest.mark.slow
+def test_long_flat_array_iteration(tmp_path):
+    # Going through an array must not keep anything for each of its items. The
+    # positions of these items alone would take 8 bytes each
+
+    n_items = 5_000_000
+
+    path = tmp_path / 'flat.json'
+
+    with open(path, 'w') as f:
+        f.write('[' + '1,' * (n_items - 1) + '1]')
+
+    with open(path) as f:
+        start_memory = get_memory_usage()
+        reader = Reader(f)
+        n_seen = sum(1 for _ in reader)
+        memory_usage = get_memory_usage() - start_memory
+
+    assert n_seen == n_items
+    assert memory_usage < n_items
+
+    # Neither must getting its length
+    with open(path) as f:
+        start_memory = get_memory_usage()
+        reader = Reader(f)
+        length = len(reader)
+        memory_usage = get_memory_usage() - start_memory
+
+    assert length == n_items
+    assert memory_usage < n_items
+
 if __name__ == "__main__":
     with open('tmp.json', 'w') as f:
         save_long_json(f, False, False)
@@ -1,7 +1,8 @@
 import io
 
 import pytest
-from sleepyjson.node import Node, NodeType, measure_string, measure_number, STRING_BUF_LENGTH
+from sleepyjson.node import Node, NodeType, measure_string, measure_number
+from sleepyjson.source import Source, BUF_LENGTH
 
 
 def test_nodes_are_creates_from_file_like_objects():
@@ -33,6 +34,16 @@ def test_nodes_know_their_type():
     with pytest.raises(ValueError):
         assert create_node('undefined')
 
+    for text in ['tru', 'fals', 'nil', '+1']:
+        with pytest.raises(ValueError):
+            create_node(text)
+
+    # Literals crossing the boundary between windows
+    assert create_node(' ' * (BUF_LENGTH - 2) + 'false').is_false()
+
+    with pytest.raises(ValueError):
+        create_node(' ' * (BUF_LENGTH - 2) + 'falsy')
+
 
 def test_simple_nodes_can_consume_their_content():
     assert create_node('true').value() == True
@@ -44,12 +55,14 @@ def test_simple_nodes_can_consume_their_content():
 
 def test_measure_string():
     def measure(text):
-        return measure_string(io.StringIO(text), 0)
+        return measure_string(Source(io.StringIO(text)), 0)
 
     assert measure('"abc"') == 5
     assert measure('""') == 2
     assert measure('"\\""') == 4
     assert measure('"He said \\"Watch out\\"!"') == 24
+    assert measure('"\\\\"') == 4
+    assert measure('"\\\\\\""') == 6
 
     with pytest.raises(ValueError):
         measure('"')
@@ -60,7 +73,7 @@ def test_measure_string():
 
 def test_measure_number():
     def measure(text):
-        return measure_number(io.StringIO(text), 0)
+        return measure_number(Source(io.StringIO(text)), 0)
 
     assert measure('3.14') == 4
     assert measure('1000') == 4
@@ -74,6 +87,21 @@ def test_measure_number():
     assert measure('1e-5e') == 4
     assert measure('0123') == 1
 
+    # Only ASCII digits are part of numbers
+    assert measure('1\u0662') == 1
+    assert measure('1.5\u0662') == 3
+
+    with pytest.raises(ValueError):
+        create_node('[1\u0662]').value()
+
+    # Numbers longer than the window of the source
+    assert measure('1' * BUF_LENGTH) == BUF_LENGTH
+    assert measure('1' * BUF_LENGTH + '.5]') == BUF_LENGTH + 2
+
+    # Numbers crossing the boundary between windows
+    assert create_node(' ' * (BUF_LENGTH - 2) + '12.5').value() == 12.5
+    assert create_node(' ' * (BUF_LENGTH - 2) + '1e-5e').end_position() == BUF_LENGTH + 2
+
     with pytest.raises(ValueError):
         measure('.3.8')
 
@@ -114,6 +142,9 @@ def test_array_nodes_can_be_indexed():
     with pytest.raises(IndexError):
         create_node('[]')[-1]
 
+    with pytest.raises(IndexError):
+        create_node('[1, 23, 456]')[-4]
+
 
 def test_array_nodes_have_a_length():
     assert len(create_node('[]')) == 0
@@ -121,6 +152,43 @@ def test_array_nodes_have_a_length():
     assert len(create_node('[1, 2]')) == 2
     assert len(create_node('[1, 2, "abc"]')) == 3
 
+    node = create_node('{"a": [1, 2], "b": 3}')
+    assert len(node) == 2
+    assert len(node) == 2
+    assert list(node) == ['a', 'b']
+
+    with pytest.raises(ValueError):
+        len(create_node('12'))
+
+    node = create_node('[0, 1, 2, 3]')
+    assert node[1].value() == 1
+    assert len(node) == 4
+    assert node[-1].value() == 3
+    assert len(node) == 4
+    assert [child.value() for child in node] == [0, 1, 2, 3]
+
+
+def test_lengths_find_the_children_of_containers():
+    node = create_node('[1, "a", [2], {"b": 3}, true]')
+    assert len(node) == 5
+    assert node[-1].value() is True
+    assert node[3]['b'].value() == 3
+    assert node.end_position() == 29
+
+    node = create_node('{"a": [1], "b": null}')
+    assert len(node) == 2
+    assert {key: child.value() for key, child in node.items()} == {
+        'a': [1], 'b': None,
+    }
+
+    node = create_node('[1, 2]')
+    assert node[0].value() == 1
+    assert len(node) == 2
+
+    for content in ['[1 2]', '[1, tru]', '{"a" 1}', '{1: 2}', '[1, "a']:
+        with pytest.raises(ValueError):
+            len(create_node(content))
+
 
 def test_arrays_can_have_trailing_comma():
     assert len(create_node('[1]')) == 1
@@ -136,6 +204,27 @@ def test_array_nodes_can_consume_their_content():
     assert create_node('[[]]').value() == [[]]
 
 
+def test_number_arrays_can_consume_their_content():
+    assert create_node('[1, -2.5, 3e2]').value() == [1, -2.5, 300.0]
+    assert create_node('[1, 2, "a", 3]').value() == [1, 2, 'a', 3]
+    assert create_node('[1, 2, // Comment\n 3,]').value() == [1, 2, 3]
+
+    with pytest.raises(ValueError):
+        create_node('[1, 0123]').value()
+
+    with pytest.raises(ValueError):
+        create_node('[1, 2 3]').value()
+
+    # Numbers crossing the boundary between windows
+    content = '[' + ', '.join(['1.25'] * BUF_LENGTH) + ']'
+    assert create_node(content).value() == [1.25] * BUF_LENGTH
+
+    node = create_node('[1, 2, 3]')
+    assert node.value() == [1, 2, 3]
+    assert node[1].value() == 2
+    assert len(node) == 3
+
+
 def test_object_nodes_can_be_indexed():
     node = create_node('{"a": 0, "b": 1}')
 
@@ -163,6 +252,41 @@ def test_object_nodes_can_be_indexed():
         create_node('{:}')['a']
 
 
+def test_object_keys_are_found_with_or_without_escapes():
+    node = create_node(r'{"a": 0, "\u0062": 1, "c\"": 2, "d": 3, "a": 4}')
+
+    assert node['b'].value() == 1
+    assert node['c"'].value() == 2
+    assert node['a'].value() == 0
+    assert node['d'].value() == 3
+    assert node['b'].value() == 1
+    assert list(node) == ['a', 'b', 'c"', 'd', 'a']
+
+    with pytest.raises(KeyError):
+        node['e']
+
+    node = Node(io.BytesIO('{"ação": 1, "ñ": 2}'.encode('utf-8')), 0)
+
+    assert node['ñ'].value() == 2
+    assert node['ação'].value() == 1
+
+
+def test_object_keys_that_need_escapes_are_not_compared_raw():
+    node = create_node(r'{"\n": 1, "\\n": 2}')
+
+    assert node['\\n'].value() == 2
+    assert node['\n'].value() == 1
+
+    with pytest.raises(KeyError):
+        create_node(r'{"\n": 1}')['\\n']
+
+    node = Node(io.BytesIO(b'{"\\ud800": 1, "\\u0000": 2}'), 0)
+
+    assert list(node) == ['\ud800', '\x00']
+    assert node['\ud800'].value() == 1
+    assert node['\x00'].value() == 2
+
+
 def test_object_nodes_have_a_length():
     assert len(create_node('{}')) == 0
     assert len(create_node('{"a": 1}')) == 1
@@ -189,12 +313,35 @@ def test_comments_are_allowed():
     with pytest.raises(IndexError):
         node[3]
 
+    with pytest.raises(ValueError):
+        create_node('/ Not a comment\n[]')
+
+
+def test_comments_and_whitespace_can_cross_buffer_boundaries():
+    # A comment that starts in one window and ends in the next
+    node = create_node(' ' * (BUF_LENGTH - 5) + '// Comment\n[1]')
+    assert node.value() == [1]
+
+    # The two slashes of a comment in different windows
+    node = create_node(' ' * (BUF_LENGTH - 1) + '// Comment\n[1]')
+    assert node.value() == [1]
+
+    # Whitespace longer than a window
+    node = create_node(' ' * (2 * BUF_LENGTH) + '[1]')
+    assert node.value() == [1]
+
 
 def test_object_nodes_can_consume_their_content():
     assert create_node('{}').value() == {}
     assert create_node('{"a": 1}').value() == {'a': 1}
     assert create_node('{"a": "b"}').value() == {'a': 'b'}
     assert create_node('{"empty": {}}').value() == {'empty': {}}
+    assert create_node('{"a\\nb": 1}').value() == {'a\nb': 1}
+    assert create_node('[{"a": 1}, {"a": 2}]').value() == [{'a': 1}, {'a': 2}]
+
+    for text in ['{1: 2}', '{"a": 1, null: 2}', '{"a" 1}', '{"a: 1}']:
+        with pytest.raises(ValueError):
+            create_node(text).value()
 
 
 def test_deep_node():
@@ -260,6 +407,50 @@ def test_malformed_json_is_not_read_unless_requested():
         node['b']
 
 
+def test_containers_are_skipped_by_matching_brackets():
+    node = create_node("""[
+        {"a": "]}", "b": [1, [2, 3]]}, // A comment with brackets ]]
+        [4, "[", {}],
+        5,
+    ]""")
+
+    assert len(node) == 3
+    assert node[2].value() == 5
+
+    # Containers whose end is known can still be read afterwards
+    assert node[0].end_position() == node[0].pos + 29
+    assert node[0]['b'].value() == [1, [2, 3]]
+    assert list(node[0]) == ['a', 'b']
+
+    # The contents of skipped containers are not validated
+    assert len(create_node('[[1 2], [3]]')) == 2
+
+    for text in ['[[1, 2}]', '[[1, / 2]]']:
+        with pytest.raises(ValueError):
+            create_node(text)[0].end_position()
+
+    with pytest.raises(ValueError):
+        create_node('[[1, 2]').end_position()
+
+    content = '[[' + '"' + 'x' * BUF_LENGTH + '"' + ' ' * BUF_LENGTH + '], 1]'
+    assert create_node(content)[1].value() == 1
+
+
+def test_strict_json_containers_are_read_in_bulk():
+    node = create_node('{"a": [1, 2.5, "x"], "b": {"c": null}} // Not part of it')
+
+    assert node.value() == {'a': [1, 2.5, 'x'], 'b': {'c': None}}
+    assert node.end_position() == 38
+
+    # Containers that are not strict JSON are read node by node
+    assert create_node('[1, 2, // Comment\n 3,]').value() == [1, 2, 3]
+    assert create_node('[[1,], [2]]').value() == [[1], [2]]
+
+    for text in ['[NaN]', '[1, -Infinity]', '{"a": [01]}']:
+        with pytest.raises(ValueError):
+            create_node(text).value()
+
+
 def test_array_nodes_can_be_iterated():
     assert [i.value() for i in create_node('[0, false]')] == [0, False]
 
@@ -296,8 +487,10 @@ def test_items_not_followed_by_comma_are_the_end_of_the_container():
 def test_strings_escape_their_contents():
     assert create_node('"\\"\\""').value() == '""'
     assert create_node('"\\r\\n"').value() == '\r\n'
+    assert create_node('"\\\\"').value() == '\\'
     assert create_node('"Ne\\u00e9"').value() == 'Neé'
     assert create_node('"Look, a smile: 😀"').value() == 'Look, a smile: 😀'
+    assert create_node('"\\ud83d\\ude00 \\/"').value() == '😀 /'
 
     with pytest.raises(ValueError):
         create_node('"Invalid escape: \\ue9"').value()
@@ -321,6 +514,78 @@ def test_iterating_over_nodes_works_even_if_file_cursors_changes():
         assert child.value() == expected_item
 
 
+def test_children_can_be_revisited():
+    node = create_node('[0, [1, 2], "three"]')
+
+    assert node[2].value() == 'three'
+    assert node[1].value() == [1, 2]
+    assert [(a.value(), b.value()) for a in node[1] for b in node[1]] == [
+        (1, 1), (1, 2), (2, 1), (2, 2)
+    ]
+
+    node = create_node('{"a": 0, "b": {"c": 1}, "d": 2}')
+
+    assert node['d'].value() == 2
+    assert node['b']['c'].value() == 1
+    assert [(a, b) for a in node for b in node['b']] == [
+        ('a', 'c'), ('b', 'c'), ('d', 'c')
+    ]
+
+
+def test_kept_nodes_are_read_after_the_window_moves():
+    # The minus sign of the number is the last character of the first window
+    content = '["' + 'x' * (BUF_LENGTH - 5) + '", -5]'
+
+    node = create_node(content)
+    child = node[1]
+    node[0]
+    assert child.value() == -5
+
+    assert [child.value() for child in list(create_node(content))] == [
+        'x' * (BUF_LENGTH - 5), -5,
+    ]
+
+
+def test_children_can_be_read_again_after_a_truncated_container_fails():
+    node = create_node('[1, 2, "abc')
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            len(node)
+
+    assert node[1].value() == 2
+    assert node[2].type == NodeType.STRING
+
+    it = iter(node)
+
+    assert [next(it).value() for _ in range(2)] == [1, 2]
+    assert next(it).type == NodeType.STRING
+
+    with pytest.raises(ValueError):
+        next(it)
+
+    with pytest.raises(ValueError):
+        len(node)
+
+    node = create_node('{"a": 1, "b": 2, "c": "x')
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            node['zz']
+
+    assert node['b'].value() == 2
+
+    it = iter(node)
+
+    assert [next(it) for _ in range(3)] == ['a', 'b', 'c']
+
+    with pytest.raises(ValueError):
+        next(it)
+
+    with pytest.raises(ValueError):
+        len(node)
+
+
 def test_number_nodes_return_int_or_float():
     values = [
         ('-10', int),
@@ -335,11 +600,31 @@ def test_number_nodes_return_int_or_float():
         assert type(create_node(string).value()) == expected_type
 
 
+def test_scalar_values_are_kept_once_read():
+    string, number = create_node('["abc", 12]')
+
+    assert string.value() == 'abc'
+    assert number.value() == 12
+
+    assert string.scalar_value == 'abc'
+    assert number.scalar_value == 12
+
+    assert string.value() == 'abc'
+    assert number.value() == 12
+
+
 def test_nodes_implement_equality():
     assert create_node('["red", "green"]').equals(['red', 'green'])
     assert create_node('{"red": "green"}').equals({'red': 'green'})
     assert create_node('"rgb"').equals('rgb')
 
+    assert not create_node('["red", "green"]').equals(['red'])
+    assert not create_node('["red"]').equals(['red', 'green'])
+    assert not create_node('["red"]').equals('red')
+    assert not create_node('{"red": "green"}').equals({'red': 'green', 'a': 1})
+    assert not create_node('{"red": "green", "a": 1}').equals({'red': 'green'})
+    assert not create_node('{"red": "green"}').equals(['red'])
+
 
 def test_nodes_implement_lazy_equality():
     assert not create_node('["red", "green" invalid').equals(['red', 'black'])
@@ -352,14 +637,14 @@ def test_escaped_characters_on_buffer_boundaries_are_detected():
     # is an escaped quote character right ar the boundary of where the buffering
     # happens: the first chunk that is read ends in a backslash and the next
     # chunk starts with a quote character. If ever the number of charcters being
-    # read in the `measure_string` function changes, this test must be changed
+    # read into the window of the source changes, this test must be changed
     # accordingly
 
-    problematic_string = '"' + 'x' * (STRING_BUF_LENGTH - 1) + '\\"' + 'x' * 10 + '"'
+    problematic_string = '"' + 'x' * (BUF_LENGTH - 2) + '\\"' + 'x' * 10 + '"'
 
     node = create_node(problematic_string)
 
-    assert node.value() == 'x' * (STRING_BUF_LENGTH - 1) + '"' + 'x' * 10
+    assert node.value() == 'x' * (BUF_LENGTH - 2) + '"' + 'x' * 10
 
 
 def test_quotes_at_start_of_buffer_are_correctly_handled():
@@ -372,8 +657,8 @@ def test_quotes_at_start_of_buffer_are_correctly_handled():
     # This test validates the code that determines if quotes at the start of the
     # buffer terminate the string
 
-    problematic_string = '"' + ' ' * STRING_BUF_LENGTH + '"\\'
+    problematic_string = '"' + ' ' * (BUF_LENGTH - 1) + '"\\'
 
     node = create_node(problematic_string)
 
-    assert node.value() == ' ' * STRING_BUF_LENGTH
+    assert node.value() == ' ' * (BUF_LENGTH - 1)
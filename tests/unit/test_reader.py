@@ -106,3 +106,22 @@ def test_reader_handles_tight_streams():
 
     with pytest.raises(StopIteration):
         assert reader.next()
+
+
+def test_reader_reads_binary_files():
+    reader = Reader(io.BytesIO('{"ñ": ["ação"]} [1]'.encode('utf-8')))
+
+    assert reader['ñ'][0].value() == 'ação'
+
+    reader.next()
+
+    assert reader.value() == [1]
+
+
+def test_readers_report_errors_reading_files():
+    class BrokenFile(io.StringIO):
+        def read(self, n=-1):
+            raise OSError('Broken file')
+
+    with pytest.raises(OSError, match='Broken file'):
+        Reader(BrokenFile('[1]'))
@@ -0,0 +1,75 @@
+import gc
+import io
+
+from sleepyjson.node import Node
+from sleepyjson.source import Source, BUF_LENGTH
+
+
+def test_sources_read_from_any_position():
+    source = Source(io.StringIO('0123456789'))
+
+    assert source.read(0, 3) == '012'
+    assert source.read(8, 3) == '89'
+    assert source.read(2, 3) == '234'
+    assert source.read(10, 1) == ''
+
+
+def test_sources_read_beyond_their_window():
+    content = 'x' * BUF_LENGTH + 'yz'
+    source = Source(io.StringIO(content))
+
+    assert source.read(0, 1) == 'x'
+    assert source.read(BUF_LENGTH - 1, 2) == 'xy'
+    assert source.read(BUF_LENGTH + 1, 5) == 'z'
+
+
+def test_windows_point_at_the_requested_position():
+    content = 'x' * BUF_LENGTH + 'yz'
+    source = Source(io.StringIO(content))
+
+    data, offset = source.window(3)
+    assert data[offset] == 'x'
+
+    data, offset = source.window(BUF_LENGTH)
+    assert data[offset:] == 'yz'
+
+    data, offset = source.window(BUF_LENGTH + 2)
+    assert offset == len(data)
+
+
+def test_utf8_files_are_read_by_byte_offsets(tmp_path):
+    path = tmp_path / 'sample.json'
+    content = '["' + 'ação' * BUF_LENGTH + '", "ñ"]'
+    path.write_text(content, encoding='utf-8')
+
+    with open(path, encoding='utf-8') as f:
+        source = Source(f)
+
+        # Multi-byte characters are read as one character per byte, and the
+        # positions that follow them are byte offsets
+        assert source.read(0, 4) == '["a\xc3'
+        assert source.decode(source.read(2, 6)) == 'ação'
+
+        assert Node(source, 0).value() == ['ação' * BUF_LENGTH, 'ñ']
+
+
+def test_utf8_files_stay_open_while_their_buffer_is_read(tmp_path):
+    path = tmp_path / 'sample.json'
+    path.write_text('{"ñ": ["ação"]}', encoding='utf-8')
+
+    # Nothing else keeps a reference to the file
+    source = Source(open(path, encoding='utf-8'))
+    node = Node(source, 0)
+    gc.collect()
+
+    try:
+        assert node['ñ'][0].value() == 'ação'
+    finally:
+        source.file.close()
+
+
+def test_binary_files_are_read_as_utf8():
+    source = Source(io.BytesIO('["ação", 1]'.encode('utf-8')))
+
+    assert source.read(0, 4) == '["a\xc3'
+    assert Node(source, 0).value() == ['ação', 1]